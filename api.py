@@ -12,6 +12,13 @@ from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
 from pydantic import BaseModel, Field, field_validator
 from starlette.middleware.base import BaseHTTPMiddleware
 
+# orjson 可用时使用 ORJSONResponse 作为默认响应类，加速大文本负载的 JSON 编码
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
 # Ensure project root is in path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
@@ -188,7 +195,7 @@ async def lifespan(app: FastAPI):
     state.save_session()
 
 
-app = FastAPI(title="Zotero Chat API", lifespan=lifespan)
+app = FastAPI(title="Zotero Chat API", lifespan=lifespan, default_response_class=DefaultResponse)
 
 # 添加中间件（注意顺序：先添加的后执行）
 # app.add_middleware(TimeoutMiddleware, timeout=300)  # 可选：5分钟超时
@@ -22,6 +22,12 @@ class ZoteroSettings(BaseSettings):
         description="Zotero 本地数据目录"
     )
     
+    # 本地检索用的 sidecar 数据库 (FTS5 全文索引)，zotero.sqlite 只读，索引单独存放
+    search_db: Path = Field(
+        default=Path("./data/zotero_search.sqlite"),
+        description="本地搜索索引数据库路径"
+    )
+    
     model_config = SettingsConfigDict(
         env_prefix="ZOTERO_",
         env_file=".env",
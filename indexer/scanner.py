@@ -53,9 +53,10 @@ class DocumentInfo(BaseModel):
         
         # Format date_added if present
         date_added_str = None
-        if item.date_added:
+        date_added = item.date_added_dt
+        if date_added:
             try:
-                date_added_str = item.date_added.isoformat()
+                date_added_str = date_added.isoformat()
             except:
                 pass
 
@@ -197,6 +198,12 @@ class DocumentScanner:
                     logger.debug(f"已加载 PDF: {doc.title}")
                 except Exception as e:
                     logger.warning(f"加载 PDF 失败 {pdf_path}: {e}")
+            elif doc.has_pdf and pdf_path:
+                # 不加载全文时只读取元数据获取页数，跳过页面文本提取
+                try:
+                    doc.pdf_pages = self._pdf_reader.read_metadata(pdf_path).num_pages
+                except Exception as e:
+                    logger.debug(f"读取 PDF 元数据失败 {pdf_path}: {e}")
             
             documents.append(doc)
             self._documents[doc.id] = doc
@@ -12,16 +12,11 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from config import get_settings
-from utils import setup_logging, get_logger, print_info, print_success, print_error
-
 
 def cmd_scan(args):
     """扫描集合命令"""
-    from zotero import CollectionManager
     from indexer import DocumentScanner
-    
-    logger = get_logger(__name__)
+    from utils import print_info, print_success, print_error
     
     scanner = DocumentScanner()
     
@@ -53,6 +48,7 @@ def cmd_scan(args):
 def cmd_list_collections(args):
     """列出所有集合"""
     from zotero import CollectionManager
+    from utils import print_info, print_success, print_error
     
     print_info("获取 Zotero 集合列表...")
     
@@ -75,6 +71,7 @@ def cmd_summarize(args):
     """总结文献命令"""
     from indexer import DocumentScanner
     from ai import AISummarizer
+    from utils import print_info, print_success, print_error
     
     scanner = DocumentScanner()
     
@@ -121,6 +118,7 @@ def cmd_research(args):
     """深度研究命令"""
     from indexer import DocumentScanner
     from ai import AISummarizer
+    from utils import print_info, print_success, print_error
     
     scanner = DocumentScanner()
     
@@ -154,6 +152,7 @@ def cmd_research(args):
 def cmd_ui(args):
     """启动 Web API 服务器"""
     import uvicorn
+    from utils import print_info
     
     print_info("启动 Zotero 文献助手 API 服务器...")
     print_info(f"API 地址: http://localhost:{args.port}")
@@ -165,8 +164,6 @@ def cmd_ui(args):
 
 def main():
     """主函数"""
-    setup_logging()
-    
     parser = argparse.ArgumentParser(
         description="Zotero 文献助手 - AI 驱动的文献管理和研究工具",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -217,6 +214,11 @@ def main():
     
     args = parser.parse_args()
     
+    # 参数解析完成后再初始化日志，--help 无需加载配置和日志依赖
+    if args.command:
+        from utils import setup_logging
+        setup_logging()
+    
     if args.command == "ui":
         cmd_ui(args)
     elif args.command == "list":
@@ -2,7 +2,6 @@
 工具模块
 """
 
-from .pdf_reader import PDFReader, PDFContent
 from .logger import (
     get_logger,
     setup_logging,
@@ -22,3 +21,11 @@ __all__ = [
     "print_warning",
     "print_error",
 ]
+
+
+def __getattr__(name: str):
+    """延迟导入 PDF 相关导出，避免 CLI 启动时加载 PDF 依赖"""
+    if name in ("PDFReader", "PDFContent"):
+        from . import pdf_reader
+        return getattr(pdf_reader, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -54,8 +54,50 @@ class PDFContent(BaseModel):
         if not self.text:
             return []
         
+        return self._split_text(self.text, chunk_size, overlap)
+    
+    def get_chunks_from_pages(self, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+        """
+        按页边界分块：逐页累积文本，再加入下一页会超过 chunk_size 时在页边界输出一块，
+        无需拼接全文；单页超过 chunk_size 时按句子边界切分该页
+        
+        Args:
+            chunk_size: 每块的字符数
+            overlap: 超长页内切分时块之间的重叠字符数
+            
+        Returns:
+            文本块列表
+        """
+        chunks = []
+        current: List[str] = []
+        current_len = 0
+        
+        for page in self.pages:
+            page = page.strip()
+            if not page:
+                continue
+            
+            if current and current_len + len(page) > chunk_size:
+                chunks.append("\n\n".join(current))
+                current = []
+                current_len = 0
+            
+            if len(page) > chunk_size:
+                chunks.extend(self._split_text(page, chunk_size, overlap))
+                continue
+            
+            current.append(page)
+            current_len += len(page) + 2
+        
+        if current:
+            chunks.append("\n\n".join(current))
+        
+        return chunks
+    
+    @staticmethod
+    def _split_text(text: str, chunk_size: int, overlap: int) -> List[str]:
+        """按字符数切分文本，尽量在句子边界处分割"""
         chunks = []
-        text = self.text
         start = 0
         
         while start < len(text):
@@ -89,7 +131,7 @@ class PDFReader:
         初始化 PDF 读取器
         
         Args:
-            use_pymupdf: 是否使用 PyMuPDF (fitz)，否则使用 pdfplumber
+            use_pymupdf: 是否使用 PyMuPDF (fitz)，否则使用 pypdfium2
         """
         self.use_pymupdf = use_pymupdf
     
@@ -113,15 +155,74 @@ class PDFReader:
         if self.use_pymupdf:
             return self._read_with_pymupdf(path)
         else:
-            return self._read_with_pdfplumber(path)
+            return self._read_with_pypdfium2(path)
+    
+    def read_metadata(self, path: Path) -> PDFContent:
+        """
+        只读取 PDF 元数据和页数，不提取页面文本
+        
+        Args:
+            path: PDF 文件路径
+            
+        Returns:
+            不含文本的 PDF 内容对象
+        """
+        path = Path(path)
+        try:
+            import fitz
+        except ImportError:
+            # 没有 PyMuPDF 时用 pypdfium2 / pdfplumber 打开文档，同样只读元数据和页数
+            return self._read_metadata_fallback(path)
+        
+        with fitz.open(str(path)) as doc:
+            metadata = dict(doc.metadata) if doc.metadata else {}
+            num_pages = len(doc)
+        
+        return PDFContent(
+            path=path,
+            title=metadata.get("title", "") or path.stem,
+            num_pages=num_pages,
+            metadata=metadata
+        )
+    
+    def _read_metadata_fallback(self, path: Path) -> PDFContent:
+        """不使用 PyMuPDF 读取元数据和页数"""
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            pdfium = None
+        
+        if pdfium is not None:
+            pdf = pdfium.PdfDocument(str(path))
+            try:
+                metadata = pdf.get_metadata_dict()
+                num_pages = len(pdf)
+            finally:
+                pdf.close()
+        else:
+            try:
+                import pdfplumber
+            except ImportError:
+                raise ImportError("请安装 PyMuPDF 或 pypdfium2: pip install PyMuPDF pypdfium2")
+            
+            with pdfplumber.open(str(path)) as pdf:
+                metadata = pdf.metadata or {}
+                num_pages = len(pdf.pages)
+        
+        return PDFContent(
+            path=path,
+            title=metadata.get("Title", "") or path.stem,
+            num_pages=num_pages,
+            metadata=metadata
+        )
     
     def _read_with_pymupdf(self, path: Path) -> PDFContent:
         """使用 PyMuPDF 读取"""
         try:
             import fitz
         except ImportError:
-            logger.warning("PyMuPDF 未安装，尝试使用 pdfplumber")
-            return self._read_with_pdfplumber(path)
+            logger.warning("PyMuPDF 未安装，尝试使用 pypdfium2")
+            return self._read_with_pypdfium2(path)
         
         try:
             doc = fitz.open(str(path))
@@ -154,12 +255,52 @@ class PDFReader:
             logger.error(f"PyMuPDF 读取失败: {e}")
             raise
     
+    def _read_with_pypdfium2(self, path: Path) -> PDFContent:
+        """使用 pypdfium2 读取"""
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            logger.warning("pypdfium2 未安装，尝试使用 pdfplumber")
+            return self._read_with_pdfplumber(path)
+        
+        try:
+            pdf = pdfium.PdfDocument(str(path))
+            try:
+                pages = []
+                for page in pdf:
+                    textpage = page.get_textpage()
+                    pages.append(textpage.get_text_range())
+                    textpage.close()
+                    page.close()
+                
+                metadata = pdf.get_metadata_dict()
+            finally:
+                pdf.close()
+            
+            full_text = "\n\n".join(pages)
+            full_text = self._clean_text(full_text)
+            
+            title = metadata.get("Title", "") or path.stem
+            
+            return PDFContent(
+                path=path,
+                title=title,
+                text=full_text,
+                pages=[self._clean_text(p) for p in pages],
+                num_pages=len(pages),
+                metadata=metadata
+            )
+            
+        except Exception as e:
+            logger.error(f"pypdfium2 读取失败: {e}")
+            raise
+    
     def _read_with_pdfplumber(self, path: Path) -> PDFContent:
         """使用 pdfplumber 读取"""
         try:
             import pdfplumber
         except ImportError:
-            raise ImportError("请安装 pdfplumber: pip install pdfplumber")
+            raise ImportError("请安装 PyMuPDF 或 pypdfium2: pip install PyMuPDF pypdfium2")
         
         try:
             pages = []
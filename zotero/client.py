@@ -3,18 +3,36 @@ Zotero API 客户端
 提供与 Zotero 服务器的 API 交互
 """
 
+import atexit
 import concurrent.futures
-import sqlite3
-from datetime import datetime
+import os
+import re
+import threading
+import weakref
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 from pyzotero import zotero
 
+# 优先使用 pysqlite3（自带较新的 SQLite，保证 FTS5/trigram 可用），未安装时回退标准库
+try:
+    from pysqlite3 import dbapi2 as sqlite3
+except ImportError:
+    import sqlite3
+
 from config import get_settings
 from .models import Collection, Item, Attachment
 
 
+class _PooledConnection(sqlite3.Connection):
+    """可弱引用的连接：线程退出后线程本地存储释放连接，登记表不再阻止其关闭"""
+
+
+def _unicode_lower(value: Any) -> Any:
+    """SQL 函数 ulower()：按 Python 规则转换 Unicode 小写，非文本值原样返回"""
+    return value.lower() if isinstance(value, str) else value
+
+
 class ZoteroClient:
     """Zotero API 客户端"""
     
@@ -23,7 +41,8 @@ class ZoteroClient:
         library_id: Optional[str] = None,
         library_type: Optional[str] = None,
         api_key: Optional[str] = None,
-        data_dir: Optional[Path] = None
+        data_dir: Optional[Path] = None,
+        store_raw: bool = False
     ):
         """
         初始化 Zotero 客户端
@@ -33,6 +52,7 @@ class ZoteroClient:
             library_type: Library 类型 (user/group)
             api_key: Zotero API Key
             data_dir: 本地 Zotero 数据目录
+            store_raw: 是否在 API 解析的条目上保留完整原始数据（默认不保留以节省内存）
         """
         settings = get_settings()
         
@@ -40,10 +60,44 @@ class ZoteroClient:
         self.library_type = library_type or settings.zotero.library_type
         self.api_key = api_key or settings.zotero.api_key
         self.data_dir = Path(data_dir or settings.zotero.data_dir)
+        self.search_db = Path(settings.zotero.search_db)
+        self.store_raw = store_raw
+        # 当前 SQLite 是否支持 FTS5 trigram 分词器（用于加速 LIKE 子串回退）
+        self._has_trigram_index = False
+        # 字段名 -> fieldID 缓存（首次查询本地库时填充）
+        self._field_ids: Optional[Dict[str, Optional[int]]] = None
+        # 本地集合列表缓存，以数据库文件签名为键，文件变化后失效
+        self._collections_cache: Optional[Tuple[tuple, tuple]] = None
+        
+        # 线程本地的只读 sqlite 连接，跨调用复用以保持页缓存和语句缓存；
+        # 登记表只持有弱引用，线程退出后其连接随线程本地存储释放并关闭
+        self._conn_tls = threading.local()
+        self._conns: "weakref.WeakSet[sqlite3.Connection]" = weakref.WeakSet()
+        self._conns_lock = threading.Lock()
+        self._conn_generation = 0
+        atexit.register(self.close)
+        
+        # 共享线程池：API 附件请求与大批量关联数据查询分开，避免相互占满后死锁；
+        # 线程常驻复用，各自的 HTTP 连接与线程本地 sqlite 连接得以保持
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=10, thread_name_prefix="zotero-io"
+        )
+        self._query_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(self._DETAIL_QUERIES), thread_name_prefix="zotero-sqlite"
+        )
+        atexit.register(self._io_pool.shutdown, wait=False)
+        atexit.register(self._query_pool.shutdown, wait=False)
         
         # 初始化 pyzotero 客户端
         self._client: Optional[zotero.Zotero] = None
         
+        # storage 目录缓存：存在的附件 key 集合
+        self._storage_keys: Optional[Set[str]] = None
+        # 快照时 storage 目录的 mtime；新建 key 子目录会改变它，据此使快照失效
+        self._storage_mtime: Optional[int] = None
+        # storage 根目录字符串，随目录快照一起确定，避免每次拼接 Path
+        self._storage_root = ""
+        
     @property
     def client(self) -> zotero.Zotero:
         """延迟初始化 Zotero 客户端"""
@@ -60,9 +114,9 @@ class ZoteroClient:
     def get_collections(self) -> List[Collection]:
         """获取所有集合（自动处理分页，获取全部）"""
         # 优先使用本地 sqlite，失败或不可用时回退 API
-        local_collections = self._get_collections_local()
-        if local_collections is not None:
-            return local_collections
+        cached = self._get_collections_cached()
+        if cached is not None:
+            return list(cached)
         
         # pyzotero 的 everything() 方法会自动处理分页
         raw_collections = self.client.everything(self.client.collections())
@@ -103,6 +157,7 @@ class ZoteroClient:
         Returns:
             条目列表
         """
+        self.sync_storage_cache()
         # 优先尝试本地 sqlite，失败/不可用时回退 API
         local_items = self._get_collection_items_local(collection_key)
         if local_items is not None:
@@ -113,29 +168,41 @@ class ZoteroClient:
             self.client.collection_items(collection_key)
         )
         items = []
+        has_children: Set[str] = set()
+        children_by_parent: Dict[str, List[Attachment]] = {}
         
-        # 先解析所有条目（不含附件）
+        # 单次遍历：集合条目列表中同时包含子附件，直接按 parentItem 归组
         for raw_item in raw_items:
-            if raw_item.get("data", {}).get("itemType") != "attachment":
+            data = raw_item.get("data", {})
+            if data.get("itemType") == "attachment":
+                parent_key = data.get("parentItem")
+                if parent_key:
+                    children_by_parent.setdefault(parent_key, []).append(self._parse_attachment(data))
+            else:
                 item = self._parse_item(raw_item)
                 items.append(item)
+                if raw_item.get("meta", {}).get("numChildren", 0):
+                    has_children.add(item.key)
         
-        # 并发获取所有附件信息
-        if items:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                future_to_item = {
-                    executor.submit(self.get_item_attachments, item.key): item
-                    for item in items
-                }
-                for future in concurrent.futures.as_completed(future_to_item):
-                    item = future_to_item[future]
-                    try:
-                        item.attachments = future.result()
-                    except Exception:
-                        item.attachments = []
+        # 子条目未随集合返回的条目才单独请求附件
+        missing = []
+        for item in items:
+            if item.key in children_by_parent:
+                item.attachments = children_by_parent[item.key]
+            elif item.key in has_children:
+                missing.append(item)
+        if missing:
+            self._fetch_attachments(missing)
         
         return items
     
+    def _fetch_attachments(self, items: List[Item]) -> None:
+        """为条目批量填充附件信息，请求在共享 I/O 线程池中并发执行"""
+        for item, attachments in zip(items, self._io_pool.map(
+            self.get_item_attachments, [item.key for item in items]
+        )):
+            item.attachments = attachments
+    
     def get_item_attachments(self, item_key: str) -> List[Attachment]:
         """
         获取条目的附件
@@ -146,6 +213,7 @@ class ZoteroClient:
         Returns:
             附件列表
         """
+        self.sync_storage_cache()
         try:
             raw_attachments = self.client.children(item_key)
             attachments = []
@@ -161,21 +229,95 @@ class ZoteroClient:
             return []
 
     def _get_sqlite_conn(self) -> Optional[sqlite3.Connection]:
-        """只读打开本地 zotero.sqlite，失败返回 None。"""
+        """
+        获取当前线程复用的只读 zotero.sqlite 连接，失败返回 None。
+        immutable 连接不会感知文件变化，因此数据库文件 (mtime, size) 变化时重新打开。
+        """
         db_path = self.data_dir / "zotero.sqlite"
-        if not db_path.exists():
+        try:
+            stat = db_path.stat()
+        except OSError:
             return None
+        signature = (stat.st_mtime_ns, stat.st_size, self._conn_generation)
+        
+        conn = getattr(self._conn_tls, "conn", None)
+        if conn is not None:
+            if self._conn_tls.signature == signature:
+                return conn
+            self._discard_conn(conn)
+            # 数据库已变化，字段 ID 需要重新解析
+            self._field_ids = None
+        
         try:
-            conn = sqlite3.connect(
-                f"file:{db_path}?mode=ro&immutable=1",
-                uri=True,
-                timeout=1
-            )
-            conn.row_factory = sqlite3.Row
-            return conn
+            conn = self._open_sqlite_conn(db_path)
         except sqlite3.Error:
             return None
-
+        
+        self._conn_tls.conn = conn
+        self._conn_tls.signature = signature
+        with self._conns_lock:
+            self._conns.add(conn)
+        return conn
+    
+    @staticmethod
+    def _open_sqlite_conn(db_path: Path) -> sqlite3.Connection:
+        """以只读、不可变模式打开 zotero.sqlite"""
+        conn = sqlite3.connect(
+            f"file:{db_path}?mode=ro&immutable=1",
+            uri=True,
+            timeout=1,
+            cached_statements=256,
+            check_same_thread=False,
+            factory=_PooledConnection
+        )
+        # 内存映射读取并放大页缓存，连接复用期间热页常驻，避免 read() 系统调用
+        conn.execute("PRAGMA mmap_size=1073741824")
+        conn.execute("PRAGMA cache_size=-131072")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # SQLite 内置 lower() 只转换 ASCII，相关性评分使用与 Python str.lower() 一致的 Unicode 小写
+        conn.create_function("ulower", 1, _unicode_lower, deterministic=True)
+        return conn
+    
+    def _discard_conn(self, conn: sqlite3.Connection) -> None:
+        """关闭并移除当前线程的连接"""
+        with self._conns_lock:
+            self._conns.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._conn_tls.conn = None
+    
+    def close(self) -> None:
+        """关闭所有线程的本地数据库连接"""
+        with self._conns_lock:
+            conns = list(self._conns)
+            self._conns.clear()
+            self._conn_generation += 1
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+    
+    # 条目查询需要透视出的字段
+    _ITEM_FIELDS = ("title", "abstractNote", "date", "publicationTitle", "DOI", "url")
+    
+    def _get_field_ids(self, conn: sqlite3.Connection) -> Optional[Dict[str, Optional[int]]]:
+        """查询并缓存字段名到 fieldID 的映射，失败返回 None。"""
+        if self._field_ids is None:
+            placeholders = ",".join("?" for _ in self._ITEM_FIELDS)
+            try:
+                rows = conn.execute(
+                    f"SELECT fieldName, fieldID FROM fields WHERE fieldName IN ({placeholders})",
+                    self._ITEM_FIELDS
+                ).fetchall()
+            except sqlite3.Error:
+                return None
+            found = dict(rows)
+            self._field_ids = {name: found.get(name) for name in self._ITEM_FIELDS}
+        return self._field_ids
+    
     def _search_items_local(self, query: str, limit: Optional[int], offset: int) -> Optional[List[Item]]:
         """
         尝试使用本地 zotero.sqlite 进行只读搜索。
@@ -185,140 +327,368 @@ class ZoteroClient:
         if conn is None:
             return None
         
-        like_pattern = f"%{query}%"
-        sql = """
+        field_ids = self._get_field_ids(conn)
+        if field_ids is None:
+            return None
+        
+        # sidecar 只用于筛选候选条目；展示的字段值始终从 itemData 读取，避免索引滞后时返回旧值
+        fts_attached = self._attach_search_index(conn)
+        
+        # 一次 LEFT JOIN 字段表并按条目分组透视出各字段
+        sql_template = """
         WITH target AS (
             SELECT items.itemID,
                    items.key,
                    itemTypes.typeName AS itemType,
-                   title.value AS title,
-                   abstract.value AS abstract,
-                   date.value AS date,
+                   MAX(CASE WHEN id.fieldID = :title THEN v.value END) AS title,
+                   MAX(CASE WHEN id.fieldID = :abstractNote THEN v.value END) AS abstract,
+                   MAX(CASE WHEN id.fieldID = :date THEN v.value END) AS date,
                    items.dateAdded AS dateAdded,
                    items.dateModified AS dateModified,
-                   publication.value AS publication,
-                   doi.value AS doi,
-                   url.value AS url
+                   MAX(CASE WHEN id.fieldID = :publicationTitle THEN v.value END) AS publication,
+                   MAX(CASE WHEN id.fieldID = :DOI THEN v.value END) AS doi,
+                   MAX(CASE WHEN id.fieldID = :url THEN v.value END) AS url
             FROM items
             JOIN itemTypes USING (itemTypeID)
-            LEFT JOIN itemData titleData
-                ON titleData.itemID = items.itemID
-               AND titleData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='title')
-            LEFT JOIN itemDataValues title ON title.valueID = titleData.valueID
-            LEFT JOIN itemData absData
-                ON absData.itemID = items.itemID
-               AND absData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='abstractNote')
-            LEFT JOIN itemDataValues abstract ON abstract.valueID = absData.valueID
-            LEFT JOIN itemData dateData
-                ON dateData.itemID = items.itemID
-               AND dateData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='date')
-            LEFT JOIN itemDataValues date ON date.valueID = dateData.valueID
-            LEFT JOIN itemData pubData
-                ON pubData.itemID = items.itemID
-               AND pubData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='publicationTitle')
-            LEFT JOIN itemDataValues publication ON publication.valueID = pubData.valueID
-            LEFT JOIN itemData doiData
-                ON doiData.itemID = items.itemID
-               AND doiData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='DOI')
-            LEFT JOIN itemDataValues doi ON doi.valueID = doiData.valueID
-            LEFT JOIN itemData urlData
-                ON urlData.itemID = items.itemID
-               AND urlData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='url')
-            LEFT JOIN itemDataValues url ON url.valueID = urlData.valueID
+            LEFT JOIN itemData id
+                ON id.itemID = items.itemID
+               AND id.fieldID IN (:title, :abstractNote, :date, :publicationTitle, :DOI, :url)
+            LEFT JOIN itemDataValues v ON v.valueID = id.valueID
             LEFT JOIN deletedItems di ON di.itemID = items.itemID
             WHERE di.itemID IS NULL
               AND itemTypes.typeName != 'attachment'
+              {match_clause}
+            GROUP BY items.itemID
+        ),
+        matched AS (
+            -- 每行只做一次 Unicode 小写转换，评分表达式复用结果；
+            -- OFFSET 0 阻止子查询被展开到外层，否则每次引用都会重新调用 ulower()
+            SELECT target.*,
+                   ulower(coalesce(title, '')) AS titleLower,
+                   ulower(coalesce(abstract, '')) AS abstractLower
+            FROM target
+            {where_clause}
+            LIMIT -1 OFFSET 0
         )
-        SELECT * FROM target
-        WHERE title LIKE ? OR abstract LIKE ?
-        ORDER BY dateAdded DESC
-        LIMIT ? OFFSET ?
+        SELECT itemID, key, itemType, title, abstract, date, dateAdded, dateModified,
+               publication, doi, url, {score_expr} AS relevanceScore
+        FROM matched
+        ORDER BY relevanceScore DESC, dateAdded DESC
+        LIMIT :limit OFFSET :offset
         """
-        try:
-            rows = conn.execute(
-                sql,
-                (
-                    like_pattern,
-                    like_pattern,
-                    limit if limit is not None else -1,
-                    offset,
-                ),
-            ).fetchall()
-        except sqlite3.Error:
-            conn.close()
-            return None
         
-        item_ids = [r["itemID"] for r in rows]
-        tags_map = self._get_tags_for_items_local(conn, item_ids)
-        attachments_map = self._get_attachments_for_items_local(conn, item_ids)
-        creators_map = self._get_creators_for_items_local(conn, item_ids)
-        collections_map = self._get_collections_for_items_local(conn, item_ids)
-        conn.close()
+        # 相关性评分在 SQL 中计算：标题命中权重为 2，摘要命中权重为 1，
+        # 由 ORDER BY ... LIMIT 直接完成排序与分页
+        base_params: Dict[str, Any] = {
+            **field_ids,
+            "limit": -1 if limit is None else limit,
+            "offset": offset,
+        }
+        score_terms = []
+        for i, kw in enumerate(query.lower().split()):
+            base_params[f"kw{i}"] = kw
+            base_params[f"kwlen{i}"] = len(kw)
+            for column, weight in (("titleLower", " * 2"), ("abstractLower", "")):
+                score_terms.append(
+                    f"(length({column}) - length(replace({column}, :kw{i}, ''))) / :kwlen{i}{weight}"
+                )
+        score_expr = "(" + " + ".join(score_terms) + ")" if score_terms else "0"
+        
+        rows = None
+        query_kind, term = self._classify_query(query)
+        if query_kind in ("doi", "arxiv"):
+            # 标识符查询直接匹配 DOI/URL 字段，跳过标题摘要的全文匹配；无结果时按普通查询处理
+            sql = sql_template.format(
+                match_clause=self._IDENTIFIER_MATCH[query_kind],
+                where_clause="",
+                score_expr=score_expr
+            )
+            params = {**base_params, "term": term}
+            try:
+                rows = conn.execute(sql, params).fetchall()
+                # 翻页越界时保留空结果；仅在标识符完全无匹配时才按普通查询处理
+                if not rows and (offset == 0 or not conn.execute(
+                    sql, {**params, "limit": 1, "offset": 0}
+                ).fetchone()):
+                    rows = None
+            except sqlite3.Error:
+                rows = None
+            query_kind = "general"
+        
+        # 有 trigram 索引时直接按子串筛选候选，结果与全表 LIKE 一致（可匹配词内片段及未分词的中文）；
+        # 仅在 trigram 不可用时使用分词 FTS5，避免前导通配符 LIKE 的全表扫描
+        use_trigram = fts_attached and self._has_trigram_index
+        fts_query = self._build_fts_query(query)
+        if fts_query and query_kind == "short":
+            # 过短的查询在摘要中命中过多，只匹配标题
+            fts_query = f"title : ({fts_query})"
+        if rows is None and fts_query and fts_attached and not use_trigram:
+            sql = sql_template.format(
+                match_clause="AND items.itemID IN (SELECT rowid FROM fts.items_fts WHERE items_fts MATCH :match)",
+                where_clause="",
+                score_expr=score_expr
+            )
+            try:
+                rows = conn.execute(sql, {**base_params, "match": fts_query}).fetchall()
+                # 翻页越界时保留空结果；仅在索引完全无匹配时才回退
+                if not rows and (offset == 0 or conn.execute(
+                    "SELECT 1 FROM fts.items_fts WHERE items_fts MATCH ? LIMIT 1", (fts_query,)
+                ).fetchone() is None):
+                    rows = None
+            except sqlite3.Error:
+                rows = None
+        
+        # 子串匹配（可匹配词内片段）
+        if rows is None:
+            like_pattern = f"%{query}%"
+            like_condition = self._LIKE_CONDITIONS[query_kind]
+            match_clause = ""
+            if use_trigram and len(query) >= 3:
+                # 先用三元组索引筛出候选条目，再由原 LIKE 条件精确过滤（少于 3 个字符时三元组无法加速）
+                match_clause = (
+                    f"AND items.itemID IN ({self._TRIGRAM_CANDIDATES[query_kind]})"
+                )
+            sql = sql_template.format(
+                match_clause=match_clause,
+                where_clause=f"WHERE {like_condition}",
+                score_expr=score_expr
+            )
+            try:
+                rows = conn.execute(sql, {**base_params, "like": like_pattern}).fetchall()
+            except sqlite3.Error:
+                return None
         
-        # 如果某个映射获取失败，用空映射兜底，避免直接回退到 API
-        tags_map = tags_map or {}
-        attachments_map = attachments_map or {}
-        creators_map = creators_map or {}
-        collections_map = collections_map or {}
+        item_ids = [row[0] for row in rows]
+        details = self._get_item_details_local(conn, item_ids)
+        
+        # 关联数据获取失败时用空映射兜底，避免直接回退到 API
+        tags_map, attachments_map, creators_map, collections_map = details or ({}, {}, {}, {})
         
         items: List[Item] = []
-        for row in rows:
-            date_added = None
-            date_modified = None
-            if row["dateAdded"]:
-                try:
-                    date_added = datetime.fromisoformat(row["dateAdded"].replace("Z", "+00:00"))
-                except Exception:
-                    date_added = None
-            if row["dateModified"]:
-                try:
-                    date_modified = datetime.fromisoformat(row["dateModified"].replace("Z", "+00:00"))
-                except Exception:
-                    date_modified = None
-            items.append(Item(
-                key=row["key"],
-                item_type=row["itemType"] or "",
-                title=row["title"] or "",
-                creators=creators_map.get(row["itemID"], []),
-                abstract=row["abstract"],
-                date=row["date"],
-                publication=row["publication"],
-                doi=row["doi"],
-                url=row["url"],
-                tags=tags_map.get(row["itemID"], []),
-                collections=collections_map.get(row["itemID"], []),
-                attachments=attachments_map.get(row["itemID"], []),
+        # 行为普通元组，按 SELECT 列顺序解包；列类型由 SQL 保证，用 model_construct 跳过校验
+        for (item_id, key, item_type, title, abstract, date, date_added, date_modified,
+             publication, doi, url, score) in rows:
+            items.append(Item.model_construct(
+                key=key,
+                item_type=item_type or "",
+                title=title or "",
+                creators=creators_map.get(item_id, []),
+                abstract=abstract,
+                date=date,
+                publication=publication,
+                doi=doi,
+                url=url,
+                tags=tags_map.get(item_id, []),
+                collections=collections_map.get(item_id, []),
+                attachments=attachments_map.get(item_id, []),
                 date_added=date_added,
                 date_modified=date_modified,
-                raw_data={"source": "local_sqlite"}
+                raw_data={"source": "local_sqlite", "relevance_score": score}
             ))
         
-        # 相关性排序：标题权重更高，然后按 date_added 逆序
-        keywords = [kw for kw in query.lower().split() if kw]
-        
-        def relevance_score(item: Item) -> int:
-            title = (item.title or "").lower()
-            abstract = (item.abstract or "").lower()
-            score = 0
-            for kw in keywords:
-                score += title.count(kw) * 2
-                score += abstract.count(kw)
-            return score
-        
-        for item in items:
-            score = relevance_score(item)
-            item.raw_data["relevance_score"] = score
-        
-        def sort_key(item: Item):
-            score = item.raw_data.get("relevance_score", 0)
-            ts = item.date_added.timestamp() if item.date_added else float("-inf")
-            return (score, ts)
-        
-        items.sort(key=sort_key, reverse=True)
-        if limit is None:
-            return items[offset:]
-        return items[offset:offset + limit]
+        return items
 
+    # 按查询形态选用的 SQL 片段
+    _DOI_PATTERN = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)?(10\.\d{4,9}/\S+)$", re.IGNORECASE)
+    _ARXIV_PATTERN = re.compile(r"^(?:arxiv:\s*)?(\d{4}\.\d{4,5})(?:v\d+)?$", re.IGNORECASE)
+    _IDENTIFIER_MATCH = {
+        "doi": """
+        AND items.itemID IN (
+            SELECT d.itemID FROM itemData d
+            JOIN itemDataValues dv ON dv.valueID = d.valueID
+            WHERE d.fieldID = :DOI AND lower(dv.value) = :term
+        )
+        """,
+        # arXiv 条目的 DOI 形如 10.48550/arXiv.<id>，或 URL 中包含编号
+        "arxiv": """
+        AND items.itemID IN (
+            SELECT d.itemID FROM itemData d
+            JOIN itemDataValues dv ON dv.valueID = d.valueID
+            WHERE (d.fieldID = :DOI AND lower(dv.value) = '10.48550/arxiv.' || :term)
+               OR (d.fieldID = :url AND instr(lower(dv.value), :term) > 0)
+        )
+        """,
+    }
+    _LIKE_CONDITIONS = {
+        "short": "title LIKE :like",
+        "general": "title LIKE :like OR abstract LIKE :like",
+    }
+    # 三元组索引候选：OR 条件无法下推到 FTS5，按列分别查询后 UNION 才能走索引
+    _TRIGRAM_CANDIDATES = {
+        "short": "SELECT rowid FROM fts.items_trigram WHERE title LIKE :like",
+        "general": """
+        SELECT rowid FROM fts.items_trigram WHERE title LIKE :like
+        UNION
+        SELECT rowid FROM fts.items_trigram WHERE abstract LIKE :like
+        """,
+    }
+    
+    @classmethod
+    def _classify_query(cls, query: str) -> Tuple[str, str]:
+        """按形态将查询分为 doi / arxiv / short / general，返回 (类别, 规范化后的检索词)"""
+        stripped = query.strip()
+        match = cls._DOI_PATTERN.match(stripped)
+        if match:
+            return "doi", match.group(1).lower()
+        match = cls._ARXIV_PATTERN.match(stripped)
+        if match:
+            return "arxiv", match.group(1)
+        # 仅对拉丁/ASCII 查询启用短查询规则：中文常见词只有两个字，仍需搜索摘要
+        if stripped.isascii() and len(stripped) < 3:
+            return "short", stripped
+        return "general", stripped
+    
+    @staticmethod
+    def _build_fts_query(query: str) -> Optional[str]:
+        """将用户查询转换为 FTS5 表达式：每个词按前缀匹配，词之间为 AND 关系"""
+        tokens = re.findall(r"\w+", query)
+        if not tokens:
+            return None
+        return " ".join(f'"{token}"*' for token in tokens)
+    
+    # sidecar 索引格式版本，同步逻辑或表结构变化时递增以触发全量重建
+    _SEARCH_INDEX_VERSION = "2"
+    
+    def _attach_search_index(self, conn: sqlite3.Connection) -> bool:
+        """
+        将 sidecar 检索库挂载为 fts，并按 items.clientDateModified 增量同步索引：
+        items_fts 用于分词匹配，items_trigram（trigram 分词器）用于加速 LIKE 子串查询，
+        item_fields 以 (itemID, fieldID) 为聚簇主键物化标题、摘要等字段，作为构建索引的数据源。
+        失败（如无法写入、SQLite 不支持 FTS5）时返回 False。
+        """
+        try:
+            attached = conn.execute(
+                "SELECT 1 FROM pragma_database_list WHERE name = 'fts'"
+            ).fetchone()
+            if not attached:
+                self.search_db.parent.mkdir(parents=True, exist_ok=True)
+                conn.execute("ATTACH DATABASE ? AS fts", (str(self.search_db),))
+        except (OSError, sqlite3.Error):
+            return False
+        
+        field_ids = self._get_field_ids(conn)
+        if field_ids is None:
+            return False
+        
+        try:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS fts.item_fields (
+                itemID INTEGER NOT NULL,
+                fieldID INTEGER NOT NULL,
+                value TEXT,
+                PRIMARY KEY (itemID, fieldID)
+            ) WITHOUT ROWID
+            """)
+            conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS fts.items_fts USING fts5(
+                title, abstract, tokenize='unicode61 remove_diacritics 2'
+            )
+            """)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS fts.sync_state (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            )
+            """)
+            try:
+                # trigram 分词器需要 SQLite >= 3.34
+                conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS fts.items_trigram USING fts5(
+                    title, abstract, tokenize='trigram'
+                )
+                """)
+                self._has_trigram_index = True
+            except sqlite3.OperationalError:
+                self._has_trigram_index = False
+            
+            index_tables = ["item_fields", "items_fts"]
+            if self._has_trigram_index:
+                index_tables.append("items_trigram")
+            
+            # 索引表集合变化（如升级 SQLite 后新增 trigram 表）时需要全量重建
+            tables_key = ",".join(index_tables)
+            state = dict(conn.execute("SELECT name, value FROM fts.sync_state").fetchall())
+            source = str(self.data_dir / "zotero.sqlite")
+            # 同步从服务器拉取的条目保留服务器端 dateModified（可能早于已同步的最大值），
+            # 因此以本地写入时间 clientDateModified 作为增量标记，并记录条目数
+            latest, count = conn.execute(
+                "SELECT MAX(clientDateModified), COUNT(*) FROM items"
+            ).fetchone()
+            latest = latest or ""
+            count = str(count)
+            synced = state.get("items_modified", "")
+            
+            if (state.get("source") != source
+                    or state.get("tables") != tables_key
+                    or state.get("version") != self._SEARCH_INDEX_VERSION
+                    or latest < synced
+                    or (latest == synced and state.get("items_count") != count)):
+                # 首次建立、数据目录或索引表变更，或数据库回退（如恢复备份）：全量重建
+                for table in index_tables:
+                    conn.execute(f"DELETE FROM fts.{table}")
+                since = None
+            elif synced < latest:
+                since = synced
+            else:
+                return True
+            
+            modified_clause = ""
+            params: Dict[str, Any] = {**field_ids, "since": since}
+            if since is not None:
+                modified_clause = "AND i.clientDateModified > :since"
+                for table in index_tables:
+                    key_column = "itemID" if table == "item_fields" else "rowid"
+                    conn.execute(
+                        f"DELETE FROM fts.{table} WHERE {key_column} IN "
+                        "(SELECT itemID FROM items WHERE clientDateModified > :since)",
+                        params
+                    )
+            
+            conn.execute(f"""
+            INSERT INTO fts.item_fields(itemID, fieldID, value)
+            SELECT i.itemID, id.fieldID, v.value
+            FROM items i
+            JOIN itemTypes it ON it.itemTypeID = i.itemTypeID
+            JOIN itemData id ON id.itemID = i.itemID
+            JOIN itemDataValues v ON v.valueID = id.valueID
+            WHERE it.typeName != 'attachment'
+              AND id.fieldID IN (:title, :abstractNote, :date, :publicationTitle, :DOI, :url)
+              {modified_clause}
+            """, params)
+            
+            conn.execute("DROP TABLE IF EXISTS temp.fts_source")
+            conn.execute(f"""
+            CREATE TEMP TABLE fts_source AS
+            SELECT f.itemID,
+                   MAX(CASE WHEN f.fieldID = :title THEN f.value END) AS title,
+                   MAX(CASE WHEN f.fieldID = :abstractNote THEN f.value END) AS abstract
+            FROM fts.item_fields f
+            {"JOIN items i ON i.itemID = f.itemID" if since is not None else ""}
+            WHERE f.fieldID IN (:title, :abstractNote)
+              {modified_clause}
+            GROUP BY f.itemID
+            """, params)
+            for table in index_tables[1:]:
+                conn.execute(f"""
+                INSERT INTO fts.{table}(rowid, title, abstract)
+                SELECT itemID, title, abstract FROM temp.fts_source
+                """)
+            conn.execute("DROP TABLE temp.fts_source")
+            conn.executemany(
+                "INSERT OR REPLACE INTO fts.sync_state(name, value) VALUES (?, ?)",
+                [("source", source), ("items_modified", latest), ("items_count", count),
+                 ("tables", tables_key), ("version", self._SEARCH_INDEX_VERSION)]
+            )
+            conn.commit()
+            return True
+        except sqlite3.Error:
+            conn.rollback()
+            try:
+                conn.execute("DETACH DATABASE fts")
+            except sqlite3.Error:
+                pass
+            return False
+    
     def search_items(self, query: str, limit: Optional[int] = None, offset: int = 0) -> List[Item]:
         """
         搜索条目
@@ -330,6 +700,7 @@ class ZoteroClient:
         Returns:
             条目列表
         """
+        self.sync_storage_cache()
         local_items = self._search_items_local(query, limit, offset)
         if local_items is not None:
             return local_items
@@ -352,6 +723,28 @@ class ZoteroClient:
         
         return items
     
+    def _get_collections_cached(self) -> Optional[Tuple[Collection, ...]]:
+        """
+        返回本地集合列表，本地不可用时返回 None。
+        结果按 zotero.sqlite 的 (mtime, size) 签名缓存，重复调用无需重新查询。
+        """
+        conn = self._get_sqlite_conn()
+        if conn is None:
+            return None
+        
+        signature = self._conn_tls.signature
+        cache = self._collections_cache
+        if cache is not None and cache[0] == signature:
+            return cache[1]
+        
+        collections = self._get_collections_local()
+        if collections is None:
+            return None
+        
+        entry = tuple(collections)
+        self._collections_cache = (signature, entry)
+        return entry
+    
     def _get_collections_local(self) -> Optional[List[Collection]]:
         """
         使用本地 sqlite 获取集合列表。
@@ -363,249 +756,211 @@ class ZoteroClient:
         
         try:
             rows = conn.execute("""
-            SELECT c.collectionID, c.key, c.collectionName AS name, c.parentCollectionID
+            SELECT c.collectionID, c.key, c.collectionName, c.parentCollectionID
             FROM collections c
             LEFT JOIN deletedCollections dc ON dc.collectionID = c.collectionID
             WHERE dc.collectionID IS NULL
             """).fetchall()
         except sqlite3.Error:
-            conn.close()
             return None
         
-        collection_ids = [r["collectionID"] for r in rows]
-        id_to_key = {r["collectionID"]: r["key"] for r in rows}
+        id_to_key = {r[0]: r[1] for r in rows}
         
-        num_items_map: Dict[int, int] = {}
-        num_collections_map: Dict[int, int] = {}
-        
-        def chunked(seq, size=500):
-            for i in range(0, len(seq), size):
-                yield seq[i:i+size]
-        
-        if collection_ids:
-            try:
-                for chunk in chunked(collection_ids):
-                    placeholders = ",".join("?" for _ in chunk)
-                    sql_items = f"""
-                    SELECT ci.collectionID, COUNT(*) AS cnt
-                    FROM collectionItems ci
-                    JOIN items i ON i.itemID = ci.itemID
-                    JOIN itemTypes it ON it.itemTypeID = i.itemTypeID
-                    LEFT JOIN deletedItems di ON di.itemID = i.itemID
-                    WHERE di.itemID IS NULL
-                      AND it.typeName != 'attachment'
-                      AND ci.collectionID IN ({placeholders})
-                    GROUP BY ci.collectionID
-                    """
-                    for row in conn.execute(sql_items, chunk):
-                        num_items_map[row["collectionID"]] = row["cnt"]
-                
-                for chunk in chunked(collection_ids):
-                    placeholders = ",".join("?" for _ in chunk)
-                    sql_children = f"""
-                    SELECT parentCollectionID AS pid, COUNT(*) AS cnt
-                    FROM collections c
-                    LEFT JOIN deletedCollections dc ON dc.collectionID = c.collectionID
-                    WHERE dc.collectionID IS NULL
-                      AND parentCollectionID IN ({placeholders})
-                    GROUP BY parentCollectionID
-                    """
-                    for row in conn.execute(sql_children, chunk):
-                        num_collections_map[row["pid"]] = row["cnt"]
-            except sqlite3.Error:
-                conn.close()
-                return None
-        
-        conn.close()
+        # 计数覆盖全部未删除集合，直接整表分组统计，无需按 ID 分块拼接 IN 列表
+        try:
+            num_items_map: Dict[int, int] = dict(conn.execute("""
+            SELECT ci.collectionID, COUNT(*) AS cnt
+            FROM collectionItems ci
+            JOIN items i ON i.itemID = ci.itemID
+            JOIN itemTypes it ON it.itemTypeID = i.itemTypeID
+            LEFT JOIN deletedItems di ON di.itemID = i.itemID
+            WHERE di.itemID IS NULL
+              AND it.typeName != 'attachment'
+            GROUP BY ci.collectionID
+            """))
+            num_collections_map: Dict[int, int] = dict(conn.execute("""
+            SELECT parentCollectionID AS pid, COUNT(*) AS cnt
+            FROM collections c
+            LEFT JOIN deletedCollections dc ON dc.collectionID = c.collectionID
+            WHERE dc.collectionID IS NULL
+              AND parentCollectionID IS NOT NULL
+            GROUP BY parentCollectionID
+            """))
+        except sqlite3.Error:
+            return None
         
         collections: List[Collection] = []
-        for r in rows:
-            parent_key = id_to_key.get(r["parentCollectionID"]) if r["parentCollectionID"] else None
+        for collection_id, key, name, parent_id in rows:
+            parent_key = id_to_key.get(parent_id) if parent_id else None
             collections.append(Collection(
-                key=r["key"],
-                name=r["name"],
+                key=key,
+                name=name,
                 parent_key=parent_key,
-                num_items=num_items_map.get(r["collectionID"], 0),
-                num_collections=num_collections_map.get(r["collectionID"], 0)
+                num_items=num_items_map.get(collection_id, 0),
+                num_collections=num_collections_map.get(collection_id, 0)
             ))
         return collections
     
-    def _get_tags_for_items_local(
+    # 条目关联数据查询，均从临时表 q_ids 读取条目 ID，列结构一致以便 UNION ALL
+    # Zotero 的 creators 表包含 firstName, lastName, fieldMode
+    # fieldMode=1 表示单字段模式（完整姓名存放在 lastName）
+    _DETAIL_QUERIES = {
+        "tag": """
+        SELECT 'tag' AS kind, it.itemID AS iid, 0 AS ord,
+               t.name AS v1, NULL AS v2, NULL AS v3, NULL AS v4, NULL AS v5
+        FROM temp.q_ids q
+        JOIN itemTags it ON it.itemID = q.itemID
+        JOIN tags t ON t.tagID = it.tagID
+        """,
+        "col": """
+        SELECT 'col' AS kind, ci.itemID AS iid, 0 AS ord,
+               c.key AS v1, NULL AS v2, NULL AS v3, NULL AS v4, NULL AS v5
+        FROM temp.q_ids q
+        JOIN collectionItems ci ON ci.itemID = q.itemID
+        JOIN collections c ON c.collectionID = ci.collectionID
+        LEFT JOIN deletedCollections dc ON dc.collectionID = c.collectionID
+        WHERE dc.collectionID IS NULL
+        """,
+        "cre": """
+        SELECT 'cre' AS kind, ic.itemID AS iid, ic.orderIndex AS ord,
+               ct.creatorType AS v1, c.firstName AS v2, c.lastName AS v3, c.fieldMode AS v4, NULL AS v5
+        FROM temp.q_ids q
+        JOIN itemCreators ic ON ic.itemID = q.itemID
+        JOIN creators c ON c.creatorID = ic.creatorID
+        JOIN creatorTypes ct ON ct.creatorTypeID = ic.creatorTypeID
+        """,
+        "att": """
+        SELECT 'att' AS kind, ia.parentItemID AS iid, 0 AS ord,
+               i.key AS v1, ia.linkMode AS v2, ia.contentType AS v3, ia.path AS v4, att_title.value AS v5
+        FROM temp.q_ids q
+        JOIN itemAttachments ia ON ia.parentItemID = q.itemID
+        JOIN items i ON i.itemID = ia.itemID
+        JOIN itemTypes it ON it.itemTypeID = i.itemTypeID
+        LEFT JOIN itemData attTitleData
+            ON attTitleData.itemID = i.itemID
+           AND attTitleData.fieldID = :title
+        LEFT JOIN itemDataValues att_title ON att_title.valueID = attTitleData.valueID
+        WHERE it.typeName = 'attachment'
+        """,
+    }
+    
+    # 条目数达到该阈值时，四类关联数据分别在独立连接上并发查询
+    _PARALLEL_DETAILS_THRESHOLD = 2000
+    
+    def _query_item_details_local(
         self,
         conn: sqlite3.Connection,
-        item_ids: List[int]
-    ) -> Optional[Dict[int, List[str]]]:
-        """批量获取条目的标签映射 itemID -> [tag]。异常时返回 None。"""
-        tags_map: Dict[int, List[str]] = {}
-        
-        if not item_ids:
-            return tags_map
-        
-        def chunked(seq, size=500):
-            for i in range(0, len(seq), size):
-                yield seq[i:i+size]
-        
-        for chunk in chunked(item_ids):
-            placeholders = ",".join("?" for _ in chunk)
-            sql = f"""
-            SELECT it.itemID, t.name
-            FROM itemTags it
-            JOIN tags t ON t.tagID = it.tagID
-            WHERE it.itemID IN ({placeholders})
-            """
-            try:
-                for row in conn.execute(sql, chunk):
-                    tags_map.setdefault(row["itemID"], []).append(row["name"])
-            except sqlite3.Error:
-                return None
+        item_ids: List[int],
+        kinds: Tuple[str, ...]
+    ) -> List[tuple]:
+        """将条目 ID 写入临时表，查询指定类别的关联数据"""
+        field_ids = self._get_field_ids(conn)
+        if field_ids is None:
+            raise sqlite3.DatabaseError("无法解析 fieldID")
+        
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS q_ids(itemID INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM temp.q_ids")
+        conn.executemany(
+            "INSERT OR IGNORE INTO temp.q_ids(itemID) VALUES (?)",
+            ((item_id,) for item_id in item_ids)
+        )
+        conn.commit()
         
-        return tags_map
+        sql = " UNION ALL ".join(self._DETAIL_QUERIES[kind] for kind in kinds)
+        sql += " ORDER BY iid, kind, ord"
+        return conn.execute(sql, {"title": field_ids["title"]}).fetchall()
+    
+    def _query_item_details_isolated(self, item_ids: List[int], kind: str) -> List[tuple]:
+        """在工作线程自己的只读连接上查询一类关联数据（供并发查询使用）"""
+        conn = self._get_sqlite_conn()
+        if conn is None:
+            raise sqlite3.OperationalError("无法打开 zotero.sqlite")
+        try:
+            return self._query_item_details_local(conn, item_ids, (kind,))
+        except sqlite3.Error:
+            conn.rollback()
+            raise
     
-    def _get_creators_for_items_local(
+    def _get_item_details_local(
         self,
         conn: sqlite3.Connection,
         item_ids: List[int]
-    ) -> Optional[Dict[int, List[Dict[str, str]]]]:
-        """批量获取作者/创作者列表，按 orderIndex 排序。"""
+    ) -> Optional[Tuple[
+        Dict[int, List[str]],
+        Dict[int, List[Attachment]],
+        Dict[int, List[Dict[str, str]]],
+        Dict[int, List[str]]
+    ]]:
+        """
+        批量获取条目的标签、附件、作者和所属集合。
+        条目较少时用一条 UNION ALL 查询取回四类数据；条目较多时四类查询在独立连接上并发执行
+        （sqlite3 执行查询时释放 GIL）。结果按 kind 列分发。
+        返回 (tags_map, attachments_map, creators_map, collections_map)，异常时返回 None。
+        """
+        tags_map: Dict[int, List[str]] = {}
+        attachments_map: Dict[int, List[Attachment]] = {}
         creators_map: Dict[int, List[Dict[str, str]]] = {}
-        if not item_ids:
-            return creators_map
-        
-        def chunked(seq, size=500):
-            for i in range(0, len(seq), size):
-                yield seq[i:i+size]
-        
-        for chunk in chunked(item_ids):
-            placeholders = ",".join("?" for _ in chunk)
-            # Zotero's creators table has firstName, lastName, fieldMode
-            # fieldMode=1 means single-field mode (name stored in lastName)
-            # We generate a 'name' field for compatibility
-            sql = f"""
-            SELECT ic.itemID,
-                   ct.creatorType,
-                   c.firstName,
-                   c.lastName,
-                   c.fieldMode,
-                   ic.orderIndex
-            FROM itemCreators ic
-            JOIN creators c ON c.creatorID = ic.creatorID
-            JOIN creatorTypes ct ON ct.creatorTypeID = ic.creatorTypeID
-            WHERE ic.itemID IN ({placeholders})
-            ORDER BY ic.itemID, ic.orderIndex
-            """
-            try:
-                for row in conn.execute(sql, chunk):
-                    # fieldMode=1 means single-field (use lastName as full name)
-                    # fieldMode=0 means two-field (firstName + lastName)
-                    field_mode = row["fieldMode"] if row["fieldMode"] is not None else 0
-                    if field_mode == 1:
-                        # Single-field mode: lastName contains the full name
-                        name = row["lastName"] or ""
-                    else:
-                        # Two-field mode: no single name, authors_str will combine firstName + lastName
-                        name = ""
-                    
-                    creators_map.setdefault(row["itemID"], []).append({
-                        "creatorType": row["creatorType"],
-                        "firstName": row["firstName"] or "",
-                        "lastName": row["lastName"] or "",
-                        "name": name
-                    })
-            except sqlite3.Error as e:
-                print(f"Error fetching creators: {e}")
-                return None
+        collections_map: Dict[int, List[str]] = {}
         
-        return creators_map
-    
-    def _get_collections_for_items_local(
-        self,
-        conn: sqlite3.Connection,
-        item_ids: List[int]
-    ) -> Optional[Dict[int, List[str]]]:
-        """批量获取条目所属集合 key 列表。"""
-        col_map: Dict[int, List[str]] = {}
         if not item_ids:
-            return col_map
-        
-        def chunked(seq, size=500):
-            for i in range(0, len(seq), size):
-                yield seq[i:i+size]
-        
-        for chunk in chunked(item_ids):
-            placeholders = ",".join("?" for _ in chunk)
-            sql = f"""
-            SELECT ci.itemID, c.key
-            FROM collectionItems ci
-            JOIN collections c ON c.collectionID = ci.collectionID
-            LEFT JOIN deletedCollections dc ON dc.collectionID = c.collectionID
-            WHERE dc.collectionID IS NULL
-              AND ci.itemID IN ({placeholders})
-            """
-            try:
-                for row in conn.execute(sql, chunk):
-                    col_map.setdefault(row["itemID"], []).append(row["key"])
-            except sqlite3.Error:
-                return None
+            return tags_map, attachments_map, creators_map, collections_map
         
-        return col_map
-    
-    def _get_attachments_for_items_local(
-        self,
-        conn: sqlite3.Connection,
-        parent_item_ids: List[int]
-    ) -> Optional[Dict[int, List[Attachment]]]:
-        """批量获取父条目的附件列表映射。异常时返回 None。"""
-        attachments_map: Dict[int, List[Attachment]] = {}
-        
-        if not parent_item_ids:
-            return attachments_map
-        
-        def chunked(seq, size=300):
-            for i in range(0, len(seq), size):
-                yield seq[i:i+size]
-        
-        for chunk in chunked(parent_item_ids):
-            placeholders = ",".join("?" for _ in chunk)
-            sql = f"""
-            SELECT ia.parentItemID,
-                   i.key AS attachmentKey,
-                   ia.linkMode,
-                   ia.contentType,
-                   ia.path,
-                   att_title.value AS title
-            FROM itemAttachments ia
-            JOIN items i ON i.itemID = ia.itemID
-            JOIN itemTypes it ON it.itemTypeID = i.itemTypeID
-            LEFT JOIN itemData attTitleData
-                ON attTitleData.itemID = i.itemID
-               AND attTitleData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='title')
-            LEFT JOIN itemDataValues att_title ON att_title.valueID = attTitleData.valueID
-            WHERE ia.parentItemID IN ({placeholders})
-              AND it.typeName = 'attachment'
-            """
-            try:
-                for row in conn.execute(sql, chunk):
-                    path_str = row["path"] or ""
-                    filename = None
-                    local_path = None
-                    if path_str:
-                        path_body = path_str.split(":", 1)[1] if ":" in path_str else path_str
-                        filename = Path(path_body).name if path_body else None
-                        # 为提速：搜索阶段先不做文件存在检查，后续按需 resolve_attachment_path
-                    
-                    att = Attachment(
-                        key=row["attachmentKey"],
-                        title=row["title"] or filename or "",
-                        filename=filename,
-                        content_type=row["contentType"],
-                        path=local_path,
-                        link_mode=str(row["linkMode"]) if row["linkMode"] is not None else ""
-                    )
-                    attachments_map.setdefault(row["parentItemID"], []).append(att)
-            except sqlite3.Error:
-                return None
+        kinds = tuple(self._DETAIL_QUERIES)
+        try:
+            if len(item_ids) < self._PARALLEL_DETAILS_THRESHOLD:
+                rows = self._query_item_details_local(conn, item_ids, kinds)
+            else:
+                # 先在当前连接解析字段 ID，避免工作线程重复查询
+                if self._get_field_ids(conn) is None:
+                    return None
+                rows = []
+                futures = [
+                    self._query_pool.submit(self._query_item_details_isolated, item_ids, kind)
+                    for kind in kinds
+                ]
+                for future in concurrent.futures.as_completed(futures):
+                    rows.extend(future.result())
+        except sqlite3.Error:
+            conn.rollback()
+            return None
         
-        return attachments_map
+        for kind, item_id, _, v1, v2, v3, v4, v5 in rows:
+            if kind == "tag":
+                tags_map.setdefault(item_id, []).append(v1)
+            elif kind == "col":
+                collections_map.setdefault(item_id, []).append(v1)
+            elif kind == "cre":
+                # fieldMode=1 为单字段模式，lastName 即完整姓名；
+                # 双字段模式不生成 name，由 authors_str 组合 firstName + lastName
+                field_mode = v4 if v4 is not None else 0
+                last_name = v3 or ""
+                creators_map.setdefault(item_id, []).append({
+                    "creatorType": v1,
+                    "firstName": v2 or "",
+                    "lastName": last_name,
+                    "name": last_name if field_mode == 1 else ""
+                })
+            else:
+                filename = None
+                if v4:
+                    # "storage:文件名" 取冒号后部分，再取最后一个 "/" 之后的文件名；
+                    # 用 partition/rfind 切片，避免 split 列表和 Path 对象的分配
+                    _, sep, path_body = v4.partition(":")
+                    if not sep:
+                        path_body = v4
+                    filename = path_body[path_body.rfind("/") + 1:] or None
+                    # 为提速：搜索阶段先不做文件存在检查，后续按需 resolve_attachment_path
+                
+                attachments_map.setdefault(item_id, []).append(Attachment.model_construct(
+                    key=v1,
+                    title=v5 or filename or "",
+                    filename=filename,
+                    content_type=v3,
+                    path=None,
+                    link_mode=str(v2) if v2 is not None else ""
+                ))
+        
+        return tags_map, attachments_map, creators_map, collections_map
     
     def _get_collection_items_local(self, collection_key: str) -> Optional[List[Item]]:
         """
@@ -625,108 +980,77 @@ class ZoteroClient:
               AND dc.collectionID IS NULL
             """, (collection_key,)).fetchone()
         except sqlite3.Error:
-            conn.close()
             return None
         
         if not row:
-            conn.close()
             return None
         
-        collection_id = row["collectionID"]
+        collection_id = row[0]
+        
+        field_ids = self._get_field_ids(conn)
+        if field_ids is None:
+            return None
         
         sql = """
         WITH target AS (
             SELECT i.itemID,
                    i.key,
                    it.typeName AS itemType,
-                   title.value AS title,
-                   abstract.value AS abstract,
-                   date.value AS date,
+                   MAX(CASE WHEN id.fieldID = :title THEN v.value END) AS title,
+                   MAX(CASE WHEN id.fieldID = :abstractNote THEN v.value END) AS abstract,
+                   MAX(CASE WHEN id.fieldID = :date THEN v.value END) AS date,
                    i.dateAdded AS dateAdded,
                    i.dateModified AS dateModified,
-                   publication.value AS publication,
-                   doi.value AS doi,
-                   url.value AS url
+                   MAX(CASE WHEN id.fieldID = :publicationTitle THEN v.value END) AS publication,
+                   MAX(CASE WHEN id.fieldID = :DOI THEN v.value END) AS doi,
+                   MAX(CASE WHEN id.fieldID = :url THEN v.value END) AS url
             FROM collectionItems ci
             JOIN items i ON i.itemID = ci.itemID
             JOIN itemTypes it ON it.itemTypeID = i.itemTypeID
-            LEFT JOIN itemData titleData
-                ON titleData.itemID = i.itemID
-               AND titleData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='title')
-            LEFT JOIN itemDataValues title ON title.valueID = titleData.valueID
-            LEFT JOIN itemData absData
-                ON absData.itemID = i.itemID
-               AND absData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='abstractNote')
-            LEFT JOIN itemDataValues abstract ON abstract.valueID = absData.valueID
-            LEFT JOIN itemData dateData
-                ON dateData.itemID = i.itemID
-               AND dateData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='date')
-            LEFT JOIN itemDataValues date ON date.valueID = dateData.valueID
-            LEFT JOIN itemData pubData
-                ON pubData.itemID = i.itemID
-               AND pubData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='publicationTitle')
-            LEFT JOIN itemDataValues publication ON publication.valueID = pubData.valueID
-            LEFT JOIN itemData doiData
-                ON doiData.itemID = i.itemID
-               AND doiData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='DOI')
-            LEFT JOIN itemDataValues doi ON doi.valueID = doiData.valueID
-            LEFT JOIN itemData urlData
-                ON urlData.itemID = i.itemID
-               AND urlData.fieldID = (SELECT fieldID FROM fields WHERE fieldName='url')
-            LEFT JOIN itemDataValues url ON url.valueID = urlData.valueID
+            LEFT JOIN itemData id
+                ON id.itemID = i.itemID
+               AND id.fieldID IN (:title, :abstractNote, :date, :publicationTitle, :DOI, :url)
+            LEFT JOIN itemDataValues v ON v.valueID = id.valueID
             LEFT JOIN deletedItems di ON di.itemID = i.itemID
             WHERE di.itemID IS NULL
               AND it.typeName != 'attachment'
-              AND ci.collectionID = ?
+              AND ci.collectionID = :collection_id
+            GROUP BY i.itemID
         )
-        SELECT * FROM target
+        SELECT itemID, key, itemType, title, abstract, date, dateAdded, dateModified,
+               publication, doi, url
+        FROM target
         """
         try:
-            rows = conn.execute(sql, (collection_id,)).fetchall()
+            rows = conn.execute(sql, {**field_ids, "collection_id": collection_id}).fetchall()
         except sqlite3.Error:
-            conn.close()
             return None
         
-        item_ids = [r["itemID"] for r in rows]
-        tags_map = self._get_tags_for_items_local(conn, item_ids)
-        attachments_map = self._get_attachments_for_items_local(conn, item_ids)
-        creators_map = self._get_creators_for_items_local(conn, item_ids)
-        collections_map = self._get_collections_for_items_local(conn, item_ids)
-        conn.close()
-        
-        if any(m is None for m in (tags_map, attachments_map, creators_map, collections_map)):
+        item_ids = [r[0] for r in rows]
+        details = self._get_item_details_local(conn, item_ids)
+        if details is None:
             return None
+        tags_map, attachments_map, creators_map, collections_map = details
         
         items: List[Item] = []
-        for r in rows:
-            date_added = None
-            date_modified = None
-            if r["dateAdded"]:
-                try:
-                    date_added = datetime.fromisoformat(r["dateAdded"].replace("Z", "+00:00"))
-                except Exception:
-                    date_added = None
-            if r["dateModified"]:
-                try:
-                    date_modified = datetime.fromisoformat(r["dateModified"].replace("Z", "+00:00"))
-                except Exception:
-                    date_modified = None
-            col_keys = collections_map.get(r["itemID"], [])
+        for (item_id, key, item_type, title, abstract, date, date_added, date_modified,
+             publication, doi, url) in rows:
+            col_keys = collections_map.get(item_id, [])
             if collection_key not in col_keys:
                 col_keys = list(col_keys) + [collection_key]
-            items.append(Item(
-                key=r["key"],
-                item_type=r["itemType"] or "",
-                title=r["title"] or "",
-                creators=creators_map.get(r["itemID"], []),
-                abstract=r["abstract"],
-                date=r["date"],
-                publication=r["publication"],
-                doi=r["doi"],
-                url=r["url"],
-                tags=tags_map.get(r["itemID"], []),
+            items.append(Item.model_construct(
+                key=key,
+                item_type=item_type or "",
+                title=title or "",
+                creators=creators_map.get(item_id, []),
+                abstract=abstract,
+                date=date,
+                publication=publication,
+                doi=doi,
+                url=url,
+                tags=tags_map.get(item_id, []),
                 collections=col_keys,
-                attachments=attachments_map.get(r["itemID"], []),
+                attachments=attachments_map.get(item_id, []),
                 date_added=date_added,
                 date_modified=date_modified,
                 raw_data={"source": "local_sqlite"}
@@ -747,17 +1071,7 @@ class ZoteroClient:
         
         # 并发获取附件
         if items:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                future_to_item = {
-                    executor.submit(self.get_item_attachments, item.key): item
-                    for item in items
-                }
-                for future in concurrent.futures.as_completed(future_to_item):
-                    item = future_to_item[future]
-                    try:
-                        item.attachments = future.result()
-                    except Exception:
-                        item.attachments = []
+            self._fetch_attachments(items)
         
         return items
     
@@ -782,22 +1096,12 @@ class ZoteroClient:
         # 解析标签
         tags = [t.get("tag", "") for t in data.get("tags", [])]
         
-        # 解析日期
-        date_added = None
-        date_modified = None
-        try:
-            if data.get("dateAdded"):
-                from datetime import datetime
-                date_added = datetime.fromisoformat(data["dateAdded"].replace("Z", "+00:00"))
-            if data.get("dateModified"):
-                date_modified = datetime.fromisoformat(data["dateModified"].replace("Z", "+00:00"))
-        except Exception:
-            pass
-        
-        return Item(
-            key=data.get("key", ""),
-            item_type=data.get("itemType", ""),
-            title=data.get("title", ""),
+        # Zotero API 返回的字段形状固定，用 model_construct 跳过逐字段校验；
+        # 字符串字段显式兜底为 ""，保证与校验构造的结果一致
+        return Item.model_construct(
+            key=data.get("key") or "",
+            item_type=data.get("itemType") or "",
+            title=data.get("title") or "",
             creators=data.get("creators", []),
             abstract=data.get("abstractNote"),
             date=data.get("date"),
@@ -806,31 +1110,29 @@ class ZoteroClient:
             url=data.get("url"),
             tags=tags,
             collections=data.get("collections", []),
-            date_added=date_added,
-            date_modified=date_modified,
-            raw_data=data
+            date_added=data.get("dateAdded"),
+            date_modified=data.get("dateModified"),
+            raw_data=data if self.store_raw else {}
         )
     
     def _parse_attachment(self, data: Dict[str, Any]) -> Attachment:
         """解析附件数据"""
         filename = data.get("filename")
-        key = data.get("key", "")
+        key = data.get("key") or ""
         
         # 构建本地文件路径
         local_path = None
         if filename and self.data_dir:
             # Zotero 存储路径格式: storage/<key>/<filename>
-            storage_path = self.data_dir / "storage" / key / filename
-            if storage_path.exists():
-                local_path = storage_path
+            local_path = self._find_storage_file(key, filename)
         
-        return Attachment(
+        return Attachment.model_construct(
             key=key,
-            title=data.get("title", ""),
+            title=data.get("title") or "",
             filename=filename,
             content_type=data.get("contentType"),
             path=local_path,
-            link_mode=data.get("linkMode", "")
+            link_mode=data.get("linkMode") or ""
         )
     
     def resolve_attachment_path(self, attachment: Attachment) -> Optional[Path]:
@@ -843,12 +1145,61 @@ class ZoteroClient:
         Returns:
             本地文件路径，如果找不到返回 None
         """
+        if attachment.filename:
+            storage_path = self._find_storage_file(attachment.key, attachment.filename)
+            if storage_path:
+                return storage_path
+        
+        # 非 storage 目录下的附件（如链接文件）仍直接检查
         if attachment.path and attachment.path.exists():
             return attachment.path
         
-        if attachment.filename:
-            storage_path = self.data_dir / "storage" / attachment.key / attachment.filename
-            if storage_path.exists():
-                return storage_path
+        return None
+    
+    def _find_storage_file(self, key: str, filename: str) -> Optional[Path]:
+        """
+        在 storage/<key>/ 中查找附件文件
+        
+        首次调用时一次性 scandir 整个 storage 目录，之后用缓存的 key 集合直接排除没有目录的附件，
+        命中时只 stat 目标文件。快照的有效性由 sync_storage_cache() 按批检查，
+        也可通过 clear_storage_cache() 强制刷新。
+        """
+        if self._storage_keys is None:
+            self._storage_root = os.path.join(self.data_dir, "storage")
+            try:
+                self._storage_mtime = os.stat(self._storage_root).st_mtime_ns
+            except OSError:
+                self._storage_mtime = None
+            try:
+                with os.scandir(self._storage_root) as entries:
+                    self._storage_keys = {e.name for e in entries if e.is_dir()}
+            except OSError:
+                self._storage_keys = set()
+        
+        if key not in self._storage_keys:
+            return None
         
+        # key 目录内文件的删除不会改变 storage 目录的 mtime，命中时仍需确认文件存在
+        path = os.path.join(self._storage_root, key, filename)
+        if os.path.isfile(path):
+            return Path(path)
         return None
+    
+    def sync_storage_cache(self) -> None:
+        """
+        检查 storage 目录快照是否过期：目录 mtime 变化（新增或删除 key 子目录）时丢弃快照。
+        每批附件解析（获取集合条目、搜索、获取附件）前调用一次，而不是每个附件都 stat。
+        """
+        if self._storage_keys is None:
+            return
+        try:
+            mtime = os.stat(self._storage_root).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._storage_mtime:
+            self._storage_keys = None
+    
+    def clear_storage_cache(self) -> None:
+        """清空 storage 目录缓存"""
+        self._storage_keys = None
+        self._storage_mtime = None
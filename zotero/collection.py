@@ -3,8 +3,10 @@
 提供更高层的集合操作接口
 """
 
+import atexit
+import concurrent.futures
 from pathlib import Path
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Iterator
 
 from .client import ZoteroClient
 from .models import Collection, Item, Attachment, SearchQuery
@@ -22,7 +24,21 @@ class CollectionManager:
         """
         self._client = client or ZoteroClient()
         self._collections_cache: Optional[Dict[str, Collection]] = None
+        # 与集合缓存同步的集合列表，缓存命中时直接返回，调用方不应修改
+        self._collections_list: List[Collection] = []
+        # 父集合 key -> 直接子集合列表（根集合的键为 None），随集合缓存一起重建
+        self._children_index: Dict[Optional[str], List[Collection]] = {}
+        # 名称索引：原名 / 小写名 -> 首个同名集合，以及按顺序排列的 (小写名, 集合) 列表
+        self._name_index: Dict[str, Collection] = {}
+        self._name_lower_index: Dict[str, Collection] = {}
+        self._names_lower: List[tuple] = []
         self._items_cache: Dict[str, List[Item]] = {}
+        # 子集合条目并发获取使用的常驻线程池；与客户端内部线程池分开，避免嵌套提交时死锁，
+        # 线程常驻也使各线程的本地 sqlite 连接得以复用
+        self._fetch_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix="zotero-collection"
+        )
+        atexit.register(self._fetch_pool.shutdown, wait=False)
     
     @property
     def client(self) -> ZoteroClient:
@@ -32,7 +48,13 @@ class CollectionManager:
     def refresh_cache(self) -> None:
         """刷新缓存"""
         self._collections_cache = None
+        self._collections_list = []
+        self._children_index = {}
+        self._name_index = {}
+        self._name_lower_index = {}
+        self._names_lower = []
         self._items_cache.clear()
+        self._client.clear_storage_cache()
     
     def get_all_collections(self, use_cache: bool = True) -> List[Collection]:
         """
@@ -45,10 +67,25 @@ class CollectionManager:
             集合列表
         """
         if use_cache and self._collections_cache is not None:
-            return list(self._collections_cache.values())
+            return self._collections_list
         
         collections = self._client.get_collections()
         self._collections_cache = {c.key: c for c in collections}
+        self._collections_list = collections
+        children_index: Dict[Optional[str], List[Collection]] = {}
+        name_index: Dict[str, Collection] = {}
+        name_lower_index: Dict[str, Collection] = {}
+        names_lower = []
+        for col in collections:
+            children_index.setdefault(col.parent_key, []).append(col)
+            name_lower = col.name.lower()
+            name_index.setdefault(col.name, col)
+            name_lower_index.setdefault(name_lower, col)
+            names_lower.append((name_lower, col))
+        self._children_index = children_index
+        self._name_index = name_index
+        self._name_lower_index = name_lower_index
+        self._names_lower = names_lower
         return collections
     
     def get_collection_by_name(
@@ -66,22 +103,20 @@ class CollectionManager:
         Returns:
             匹配的集合
         """
-        collections = self.get_all_collections()
+        self.get_all_collections()
         
         if exact_match:
-            for col in collections:
-                if col.name == name:
-                    return col
-        else:
-            name_lower = name.lower()
-            # 先尝试精确匹配
-            for col in collections:
-                if col.name.lower() == name_lower:
-                    return col
-            # 再尝试包含匹配
-            for col in collections:
-                if name_lower in col.name.lower():
-                    return col
+            return self._name_index.get(name)
+        
+        name_lower = name.lower()
+        # 先尝试精确匹配（不区分大小写）
+        col = self._name_lower_index.get(name_lower)
+        if col is not None:
+            return col
+        # 再尝试包含匹配
+        for col_name_lower, col in self._names_lower:
+            if name_lower in col_name_lower:
+                return col
         
         return None
     
@@ -110,20 +145,17 @@ class CollectionManager:
         
         cache_key = f"{collection.key}:{include_subcollections}"
         
+        # 条目可能来自缓存，在本批附件路径解析前检查一次 storage 目录快照
+        self._client.sync_storage_cache()
         if use_cache and cache_key in self._items_cache:
             items = self._items_cache[cache_key]
         else:
-            items = self._client.get_collection_items(collection.key)
-            
-            if include_subcollections:
-                # 获取子集合
-                all_collections = self.get_all_collections()
-                sub_collections = self._get_subcollections(collection.key, all_collections)
-                
-                for sub_col in sub_collections:
-                    sub_items = self._client.get_collection_items(sub_col.key)
-                    items.extend(sub_items)
-            
+            # 同一条目可能同时位于多个子集合中，按 key 去重并保留首次出现的顺序；
+            # 缓存保存未过滤的完整列表（use_cache=False 表示强制刷新而非绕过缓存）
+            items_by_key: Dict[str, Item] = {}
+            for item in self._iter_collection_items(collection.key, include_subcollections):
+                items_by_key.setdefault(item.key, item)
+            items = list(items_by_key.values())
             self._items_cache[cache_key] = items
         
         if pdf_only:
@@ -131,6 +163,27 @@ class CollectionManager:
         
         return items
 
+    def _iter_collection_items(
+        self,
+        collection_key: str,
+        include_subcollections: bool = False
+    ) -> Iterator[Item]:
+        """
+        依次产出集合及其各子集合（先序）中的条目。
+        子集合在线程池中提前并发获取，与主集合的获取重叠进行，结果按子集合顺序产出。
+        """
+        sub_results = None
+        if include_subcollections:
+            sub_results = self._fetch_pool.map(
+                self._client.get_collection_items,
+                [sub_col.key for sub_col in self._get_subcollections(collection_key)]
+            )
+        
+        yield from self._client.get_collection_items(collection_key)
+        if sub_results is not None:
+            for sub_items in sub_results:
+                yield from sub_items
+    
     def search_items(self, query: str, limit: Optional[int] = None, offset: int = 0) -> List[Item]:
         """
         搜索条目
@@ -145,17 +198,17 @@ class CollectionManager:
         """
         return self._client.search_items(query, limit, offset)
     
-    def _get_subcollections(
-        self,
-        parent_key: str,
-        all_collections: List[Collection]
-    ) -> List[Collection]:
-        """递归获取所有子集合"""
+    def _get_subcollections(self, parent_key: str) -> List[Collection]:
+        """按子集合索引获取所有后代集合（先序遍历）"""
+        self.get_all_collections()
+        children_index = self._children_index
+        
         result = []
-        for col in all_collections:
-            if col.parent_key == parent_key:
-                result.append(col)
-                result.extend(self._get_subcollections(col.key, all_collections))
+        stack = list(reversed(children_index.get(parent_key, [])))
+        while stack:
+            col = stack.pop()
+            result.append(col)
+            stack.extend(reversed(children_index.get(col.key, [])))
         return result
     
     def get_pdf_files(
@@ -185,8 +238,9 @@ class CollectionManager:
         pdf_files = []
         for item in items:
             for att in item.pdf_attachments:
+                # resolve_attachment_path 已 stat 确认文件存在，无需再次检查
                 path = self._client.resolve_attachment_path(att)
-                if path and path.exists():
+                if path:
                     pdf_files.append({
                         "item": item,
                         "attachment": att,
@@ -211,69 +265,69 @@ class CollectionManager:
         else:
             items = self._client.get_all_items(limit=500)
         
-        # 应用过滤器
-        results = items
+        # 应用过滤器：按查询预先编译出单个谓词，一次遍历完成所有过滤
+        predicate = self._compile_query(query)
+        return [item for item in items if predicate(item)]
+    
+    def _compile_query(self, query: SearchQuery) -> Callable[[Item], bool]:
+        """
+        将搜索查询编译为单个条目谓词
         
-        if query.keywords:
-            results = self._filter_by_keywords(results, query.keywords)
+        小写关键词、标签集合等只在编译时计算一次并由闭包持有；
+        代价最低的布尔/哈希判断排在前面，子串匹配只作用于通过前面判断的条目
         
-        if query.authors:
-            results = self._filter_by_authors(results, query.authors)
+        Args:
+            query: 搜索查询参数
+            
+        Returns:
+            判断条目是否匹配的函数
+        """
+        predicates: List[Callable[[Item], bool]] = []
         
-        if query.tags:
-            results = self._filter_by_tags(results, query.tags)
+        if query.has_pdf:
+            predicates.append(lambda item: item.has_pdf)
         
         if query.item_types:
-            results = [
-                item for item in results
-                if item.item_type in query.item_types
-            ]
+            item_types = frozenset(query.item_types)
+            predicates.append(lambda item: item.item_type in item_types)
         
-        if query.has_pdf:
-            results = [item for item in results if item.has_pdf]
+        if query.tags:
+            tags_lower = frozenset(t.lower() for t in query.tags)
+            predicates.append(lambda item: not tags_lower.isdisjoint(item.tags_lower))
         
-        return results
-    
-    def _filter_by_keywords(
-        self,
-        items: List[Item],
-        keywords: List[str]
-    ) -> List[Item]:
-        """按关键词过滤"""
-        results = []
-        for item in items:
-            text = f"{item.title} {item.abstract or ''}"
-            text_lower = text.lower()
-            if all(kw.lower() in text_lower for kw in keywords):
-                results.append(item)
-        return results
-    
-    def _filter_by_authors(
-        self,
-        items: List[Item],
-        authors: List[str]
-    ) -> List[Item]:
-        """按作者过滤"""
-        results = []
-        for item in items:
-            authors_str = item.authors_str.lower()
-            if any(author.lower() in authors_str for author in authors):
-                results.append(item)
-        return results
-    
-    def _filter_by_tags(
-        self,
-        items: List[Item],
-        tags: List[str]
-    ) -> List[Item]:
-        """按标签过滤"""
-        results = []
-        tags_lower = [t.lower() for t in tags]
-        for item in items:
-            item_tags = [t.lower() for t in item.tags]
-            if any(t in item_tags for t in tags_lower):
-                results.append(item)
-        return results
+        if query.authors:
+            authors_lower = tuple(author.lower() for author in query.authors)
+            predicates.append(
+                lambda item: any(author in item.authors_lower for author in authors_lower)
+            )
+        
+        if query.keywords:
+            # 去重后按长度降序检查：较长的词更少命中，AND 判断能更早短路
+            keywords_lower = tuple(
+                sorted({kw.lower() for kw in query.keywords}, key=len, reverse=True)
+            )
+            
+            def match_keywords(item: Item) -> bool:
+                text_lower = item.search_text
+                for kw in keywords_lower:
+                    if kw not in text_lower:
+                        return False
+                return True
+            
+            predicates.append(match_keywords)
+        
+        if not predicates:
+            return lambda item: True
+        if len(predicates) == 1:
+            return predicates[0]
+        
+        def match_all(item: Item) -> bool:
+            for predicate in predicates:
+                if not predicate(item):
+                    return False
+            return True
+        
+        return match_all
     
     def list_collection_names(self) -> List[str]:
         """列出所有集合名称"""
@@ -289,32 +343,25 @@ class CollectionManager:
         """
         collections = self.get_all_collections()
         
-        # 构建树
-        tree = {}
-        key_to_col = {c.key: c for c in collections}
-        
-        def build_node(col: Collection) -> Dict:
-            return {
+        # 先为每个集合建立节点，再单次遍历挂到父节点下；
+        # 父集合不存在的节点不可达，与根节点无关联，自然不出现在结果中
+        nodes = {
+            col.key: {
                 "key": col.key,
                 "name": col.name,
                 "num_items": col.num_items,
                 "children": []
             }
-        
-        # 找出根节点
-        roots = [c for c in collections if not c.parent_key]
-        
-        def add_children(parent_key: str, node: Dict):
-            for col in collections:
-                if col.parent_key == parent_key:
-                    child_node = build_node(col)
-                    add_children(col.key, child_node)
-                    node["children"].append(child_node)
+            for col in collections
+        }
         
         result = []
-        for root in roots:
-            node = build_node(root)
-            add_children(root.key, node)
-            result.append(node)
+        for col in collections:
+            if col.parent_key is None:
+                result.append(nodes[col.key])
+            else:
+                parent = nodes.get(col.parent_key)
+                if parent is not None:
+                    parent["children"].append(nodes[col.key])
         
         return {"collections": result}
@@ -3,12 +3,28 @@ Zotero 数据模型
 """
 
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 
 from pydantic import BaseModel, Field
 
 
+def _parse_datetime(value: Optional[Union[datetime, str]]) -> Optional[datetime]:
+    """解析 Zotero 时间字符串，末尾的 'Z' 直接切片替换为 UTC 偏移"""
+    if not value or isinstance(value, datetime):
+        return value or None
+    try:
+        if value[-1] == "Z":
+            return datetime.fromisoformat(value[:-1] + "+00:00")
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+
+
+PDF_CONTENT_TYPE = "application/pdf"
+
+
 class Attachment(BaseModel):
     """Zotero 附件模型"""
     key: str = Field(..., description="附件唯一标识")
@@ -18,13 +34,14 @@ class Attachment(BaseModel):
     path: Optional[Path] = Field(default=None, description="本地文件路径")
     link_mode: str = Field(default="", description="链接模式")
     
-    @property
+    @cached_property
     def is_pdf(self) -> bool:
-        """判断是否为 PDF 文件"""
+        """判断是否为 PDF 文件（首次访问时计算并缓存）"""
         if self.content_type:
-            return self.content_type == "application/pdf"
+            return self.content_type == PDF_CONTENT_TYPE
         if self.filename:
-            return self.filename.lower().endswith(".pdf")
+            # 只比较末尾 4 个字符，避免为整个文件名生成小写副本
+            return self.filename[-4:].lower() == ".pdf"
         return False
     
     @property
@@ -47,13 +64,35 @@ class Item(BaseModel):
     tags: List[str] = Field(default_factory=list, description="标签列表")
     collections: List[str] = Field(default_factory=list, description="所属集合")
     attachments: List[Attachment] = Field(default_factory=list, description="附件列表")
-    date_added: Optional[datetime] = Field(default=None, description="添加日期")
-    date_modified: Optional[datetime] = Field(default=None, description="修改日期")
+    # 保留 Zotero 原始时间字符串（ISO 8601，可按字典序比较），需要 datetime 时再解析
+    date_added: Optional[Union[datetime, str]] = Field(default=None, description="添加日期")
+    date_modified: Optional[Union[datetime, str]] = Field(default=None, description="修改日期")
     
     # 额外的原始数据
     raw_data: Dict[str, Any] = Field(default_factory=dict, description="原始数据")
     
     @property
+    def date_added_dt(self) -> Optional[datetime]:
+        """添加日期（按需解析为 datetime）"""
+        return _parse_datetime(self.date_added)
+    
+    @property
+    def date_modified_dt(self) -> Optional[datetime]:
+        """修改日期（按需解析为 datetime）"""
+        return _parse_datetime(self.date_modified)
+    
+    @cached_property
+    def search_text(self) -> str:
+        """小写的 "标题 摘要" 文本，供关键词过滤使用（首次访问时计算并缓存）"""
+        return f"{self.title} {self.abstract or ''}".lower()
+    
+    @cached_property
+    def tags_lower(self) -> frozenset:
+        """小写标签集合，供标签过滤使用（首次访问时计算并缓存）"""
+        return frozenset(t.lower() for t in self.tags)
+    
+    # 以下派生属性在首次访问时计算并缓存；attachments/creators 需在访问前填充完毕
+    @cached_property
     def authors_str(self) -> str:
         """格式化作者列表为字符串"""
         def format_creator(creator: Dict[str, str]) -> str:
@@ -66,41 +105,38 @@ class Item(BaseModel):
             return f"{first} {last}".strip()
         
         # First try to get only authors
-        authors = []
-        for creator in self.creators:
-            if creator.get("creatorType") == "author":
-                name = format_creator(creator)
-                if name:
-                    authors.append(name)
+        names = [
+            (creator.get("creatorType") == "author", format_creator(creator))
+            for creator in self.creators
+        ]
+        authors = [name for is_author, name in names if is_author and name]
         
         # If no authors found, use all creators as fallback
         if not authors:
-            for creator in self.creators:
-                name = format_creator(creator)
-                if name:
-                    authors.append(name)
+            authors = [name for _, name in names if name]
         
         return ", ".join(authors) if authors else "Unknown"
     
-    @property
+    @cached_property
+    def authors_lower(self) -> str:
+        """小写的作者字符串，供作者过滤使用（首次访问时计算并缓存）"""
+        return self.authors_str.lower()
+    
+    @cached_property
     def pdf_attachments(self) -> List[Attachment]:
         """获取所有 PDF 附件"""
         return [att for att in self.attachments if att.is_pdf]
     
-    @property
+    @cached_property
     def has_pdf(self) -> bool:
         """检查是否有 PDF 附件"""
         return len(self.pdf_attachments) > 0
     
     def get_citation(self) -> str:
         """生成简单引用格式"""
-        parts = [self.authors_str]
-        if self.date:
-            parts.append(f"({self.date})")
-        parts.append(self.title)
-        if self.publication:
-            parts.append(self.publication)
-        return ". ".join(parts)
+        date = f". ({self.date})" if self.date else ""
+        publication = f". {self.publication}" if self.publication else ""
+        return f"{self.authors_str}{date}. {self.title}{publication}"
 
 
 class Collection(BaseModel):